@@ -5,45 +5,174 @@ MiracleCast GUI - A user-friendly interface for WiFi Display functionality
 
 import sys
 import os
-import subprocess
 import re
 import time
 import shlex
-import atexit
+import shutil
+import stat
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget,
-    QTabWidget, QTextEdit, QLabel, QComboBox, QMessageBox,
+    QTabWidget, QPlainTextEdit, QLabel, QComboBox, QMessageBox,
     QGroupBox, QGridLayout, QCheckBox, QHBoxLayout,
     QListWidget, QListWidgetItem, QStackedWidget, QLineEdit
 )
-from PyQt5.QtCore import QProcess, Qt, QTimer, QProcessEnvironment
-from PyQt5.QtGui import QIcon, QFont
+from PyQt5.QtCore import (
+    QProcess, Qt, QTimer, QProcessEnvironment, QLocale, QObject, QStateMachine,
+    QState, pyqtSignal, pyqtSlot
+)
+from PyQt5.QtGui import QIcon, QFont, QIntValidator
+from PyQt5.QtDBus import (
+    QDBusConnection, QDBusMessage, QDBusObjectPath, QDBusPendingCallWatcher,
+    QDBusPendingReply, QDBusVariant
+)
+
+# Directory holding this script and its helper scripts
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+_UNIVERSAL_SCRIPT = os.path.join(_MODULE_DIR, "miraclecast-universal.sh")
+
+# Interface name from an `ip link show` header line, e.g. "3: wlan0: <...>"
+_IFACE_RE = re.compile(r'^\d+:\s+([^:@]+)')
+# Virtual interfaces that are never useful for WiFi Display
+_SKIP_PREFIXES = ('lo', 'virbr', 'docker', 'veth', 'br-')
+# Process output lines per second shown before the rest is summarized
+_LOG_FLOOD_RATE = 50
+# Seconds an interface list is reused before querying again
+_IFACE_CACHE_TTL = 2.0
+
+# systemd D-Bus names used to follow service state
+_SYSTEMD_SERVICE = 'org.freedesktop.systemd1'
+_SYSTEMD_PATH = '/org/freedesktop/systemd1'
+_SYSTEMD_MANAGER = 'org.freedesktop.systemd1.Manager'
+_SYSTEMD_UNIT = 'org.freedesktop.systemd1.Unit'
+_DBUS_PROPERTIES = 'org.freedesktop.DBus.Properties'
+
+# Services the setup tab is allowed to start and stop
+_ALLOWED_SERVICES = frozenset({"NetworkManager", "wpa_supplicant", "network-manager"})
+
+def int_validator(bottom, top, parent):
+    """Create an integer validator that only accepts plain digits"""
+    validator = QIntValidator(bottom, top, parent)
+    # Group separators like "1,280" would pass the default locale but break the script
+    locale = QLocale.c()
+    locale.setNumberOptions(QLocale.RejectGroupSeparator)
+    validator.setLocale(locale)
+    return validator
+
+
+class ProcessStatus(QObject):
+    """Process lifecycle signals driving a status label state machine"""
+    started = pyqtSignal()
+    stopping = pyqtSignal()
+    stopped = pyqtSignal()
+    errored = pyqtSignal()
+    failedToStart = pyqtSignal()
+
+    def __init__(self, label, parent=None):
+        super().__init__(parent)
+        self.machine = QStateMachine(self)
+        states = {}
+        for signal, text in ((self.stopped, "Not Running"),
+                             (self.started, "Running"),
+                             (self.stopping, "Stopping..."),
+                             (self.errored, "Error"),
+                             (self.failedToStart, "Start Failed")):
+            state = QState(self.machine)
+            state.assignProperty(label, "text", text)
+            states[signal] = state
+
+        # Every signal leads to its state, whatever the current one is
+        for source in states.values():
+            for signal, target in states.items():
+                source.addTransition(signal, target)
+
+        self.machine.setInitialState(states[self.stopped])
+        self.machine.start()
+
 
 class MiracleCastGUI(QMainWindow):
     """Main application window"""
     def __init__(self):
         super().__init__()
         self.processes = {}
+        self.process_status = {}
+        self.stopping_processes = set()
+        self.pending_commands = {}
+        self.tasks = {}
+        self.unit_labels = {}
+        self.units_loading = 0
+        self.helper = None
+        self.helper_lines = []
+        self.helper_requests = []
         self.interfaces = []
+        self.interfaces_time = None
         self.mirror_commands = []
-        self.universal_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "miraclecast-universal.sh")
+        self.log_buffer = []
+        self.log_pending = False
+        self.log_second = None
+        self.log_timestamp = ""
+        self.log_rate_second = None
+        self.log_rate = 0
+        self.log_suppressed = 0
+        self.output_partial = {}
+        self.universal_script = _UNIVERSAL_SCRIPT
         self.init_ui()
         QTimer.singleShot(100, self.check_dependencies)
         
-        # Register cleanup on exit
-        atexit.register(self.cleanup_on_exit)
+        # Terminate processes while the Qt objects are still alive
+        self.closing = False
+        self.killed = False
+        QApplication.instance().aboutToQuit.connect(self.cleanup_on_exit)
         
     def cleanup_on_exit(self):
-        """Ensure all processes are properly terminated on exit"""
+        """Ask all running processes to terminate, killing them after 2 seconds"""
+        if self.helper is not None:
+            # The helper exits on its own once its stdin is closed
+            self.helper.closeWriteChannel()
+
+        # Don't let a queued restart outlive the window
+        self.pending_commands.clear()
+
+        running = False
         for name, process in self.processes.items():
-            try:
-                if process.state() != QProcess.NotRunning:
-                    self.log(f"Cleaning up process: {name}")
-                    process.terminate()
-                    if not process.waitForFinished(2000):
-                        process.kill()
-            except Exception as e:
-                print(f"Error cleaning up process {name}: {e}")
+            if process.state() != QProcess.NotRunning:
+                self.log(f"Cleaning up process: {name}")
+                # Exit codes of a requested stop are not errors
+                self.stopping_processes.add(name)
+                process.terminate()
+                running = True
+        if running:
+            QTimer.singleShot(2000, self.kill_remaining)
+        return running
+
+    def kill_remaining(self):
+        """Kill processes that ignored terminate"""
+        self.killed = True
+        for name, process in self.processes.items():
+            if process.state() != QProcess.NotRunning:
+                self.log(f"Process '{name}' didn't terminate gracefully, forcing kill", error=True)
+                process.kill()
+        # Otherwise process_finished closes the window once the kill lands
+        if self.closing and not self.processes_running():
+            self.close()
+
+    def processes_running(self):
+        """Check whether any managed process is still running"""
+        return any(process.state() != QProcess.NotRunning
+                   for process in self.processes.values())
+
+    def closeEvent(self, event):
+        """Give running processes time to clean up before closing"""
+        if not self.closing:
+            if self.cleanup_on_exit():
+                # Closed again once the processes exit, or after kill_remaining ran
+                self.closing = True
+                event.ignore()
+                return
+        elif self.processes_running() and not self.killed:
+            # Still within the grace period, keep the cleanup traps alive
+            event.ignore()
+            return
+        event.accept()
 
     def init_ui(self):
         """Initialize user interface"""
@@ -58,22 +187,25 @@ class MiracleCastGUI(QMainWindow):
         main_widget = QWidget()
         layout = QVBoxLayout()
 
-        # Tab widget
+        # Tab widget, only the default sink tab is built up front
         tabs = QTabWidget()
+        self.tabs = tabs
         self.sink_tab = self.create_sink_tab()
-        self.source_tab = self.create_source_tab()
-        self.setup_tab = self.create_setup_tab()
+        self.source_tab = None
+        self.setup_tab = None
 
         tabs.addTab(self.sink_tab, "Receive Display (Sink)")
-        tabs.addTab(self.source_tab, "Send Display (Source)")
-        tabs.addTab(self.setup_tab, "Setup")
+        tabs.addTab(QWidget(), "Send Display (Source)")
+        tabs.addTab(QWidget(), "Setup")
+        tabs.currentChanged.connect(self.build_deferred_tab)
 
         # Console output
         console_group = QGroupBox("Console Output")
         console_layout = QVBoxLayout()
-        self.console = QTextEdit()
+        self.console = QPlainTextEdit()
         self.console.setReadOnly(True)
         self.console.setFont(QFont("Monospace", 10))
+        self.console.setMaximumBlockCount(2000)
         console_layout.addWidget(self.console)
 
         clear_btn = QPushButton("Clear Console")
@@ -87,6 +219,27 @@ class MiracleCastGUI(QMainWindow):
         main_widget.setLayout(layout)
         self.setCentralWidget(main_widget)
 
+    def build_deferred_tab(self, index):
+        """Replace a placeholder tab with the real one when first selected"""
+        if index == 1 and self.source_tab is None:
+            self.source_tab = tab = self.create_source_tab()
+            # Show the interfaces already found for the sink tab
+            self.populate_interfaces(self.interfaces, self.source_iface_combo)
+        elif index == 2 and self.setup_tab is None:
+            self.setup_tab = tab = self.create_setup_tab()
+        else:
+            return
+
+        # Swapping tabs moves the current index, don't re-enter this handler
+        self.tabs.blockSignals(True)
+        placeholder = self.tabs.widget(index)
+        title = self.tabs.tabText(index)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, tab, title)
+        self.tabs.setCurrentIndex(index)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+
     def create_sink_tab(self):
         """Create sink control tab"""
         tab = QWidget()
@@ -97,7 +250,7 @@ class MiracleCastGUI(QMainWindow):
         iface_layout = QHBoxLayout()
         self.iface_combo = QComboBox()
         refresh_btn = QPushButton("Refresh")
-        refresh_btn.clicked.connect(self.refresh_interfaces)
+        refresh_btn.clicked.connect(lambda: self.refresh_interfaces())
         iface_layout.addWidget(QLabel("Select Interface:"))
         iface_layout.addWidget(self.iface_combo)
         iface_layout.addWidget(refresh_btn)
@@ -146,6 +299,7 @@ class MiracleCastGUI(QMainWindow):
         self.sink_status_label = QLabel("Not Running")
         status_group.setLayout(QVBoxLayout())
         status_group.layout().addWidget(self.sink_status_label)
+        self.process_status['sink'] = ProcessStatus(self.sink_status_label, self)
 
         instructions = QLabel(
             "<b>Instructions:</b><br>"
@@ -191,10 +345,12 @@ class MiracleCastGUI(QMainWindow):
         res_layout.addWidget(QLabel("Resolution:"))
         self.source_res_width = QLineEdit("1280")
         self.source_res_width.setMaximumWidth(60)
+        self.source_res_width.setValidator(int_validator(320, 3840, self))
         res_layout.addWidget(self.source_res_width)
         res_layout.addWidget(QLabel("x"))
         self.source_res_height = QLineEdit("720")
         self.source_res_height.setMaximumWidth(60)
+        self.source_res_height.setValidator(int_validator(240, 2160, self))
         res_layout.addWidget(self.source_res_height)
         options_layout.addLayout(res_layout)
         
@@ -203,11 +359,18 @@ class MiracleCastGUI(QMainWindow):
         perf_layout.addWidget(QLabel("FPS:"))
         self.source_fps = QLineEdit("30")
         self.source_fps.setMaximumWidth(40)
+        self.source_fps.setValidator(int_validator(10, 60, self))
         perf_layout.addWidget(self.source_fps)
         perf_layout.addWidget(QLabel("Bitrate (kbps):"))
         self.source_bitrate = QLineEdit("8192")
+        self.source_bitrate.setValidator(int_validator(1000, 20000, self))
         perf_layout.addWidget(self.source_bitrate)
         options_layout.addLayout(perf_layout)
+
+        # Only allow starting while every numeric field is within range
+        for field in (self.source_res_width, self.source_res_height,
+                      self.source_fps, self.source_bitrate):
+            field.textChanged.connect(self.update_source_start_btn)
         
         # Hardware fixes
         self.source_hw_fixes_check = QCheckBox("Apply hardware compatibility fixes")
@@ -257,6 +420,7 @@ class MiracleCastGUI(QMainWindow):
         self.source_status_label = QLabel("Not Running")
         status_group.setLayout(QVBoxLayout())
         status_group.layout().addWidget(self.source_status_label)
+        self.process_status['source'] = ProcessStatus(self.source_status_label, self)
 
         # Assembly
         layout.addWidget(iface_group)
@@ -267,6 +431,13 @@ class MiracleCastGUI(QMainWindow):
         tab.setLayout(layout)
         return tab
 
+    def update_source_start_btn(self):
+        """Enable the source start button when all numeric fields are valid"""
+        self.start_source_btn.setEnabled(all(
+            field.hasAcceptableInput()
+            for field in (self.source_res_width, self.source_res_height,
+                          self.source_fps, self.source_bitrate)))
+
     def create_setup_tab(self):
         """Create setup tab"""
         tab = QWidget()
@@ -294,7 +465,7 @@ class MiracleCastGUI(QMainWindow):
         svc_layout.addWidget(self.wpa_status, 1, 3)
 
         refresh_btn = QPushButton("Refresh Status")
-        refresh_btn.clicked.connect(self.check_services_status)
+        refresh_btn.clicked.connect(lambda: self.check_services_status())
         svc_layout.addWidget(refresh_btn, 2, 0, 1, 4)
 
         self.nm_stop_btn.clicked.connect(lambda: self.manage_service("NetworkManager", False))
@@ -337,7 +508,7 @@ class MiracleCastGUI(QMainWindow):
         layout.addWidget(svc_group)
         layout.addWidget(universal_group)
         layout.addWidget(info_group)
-        QTimer.singleShot(500, self.check_services_status)
+        QTimer.singleShot(0, self.watch_services_status)
         tab.setLayout(layout)
         return tab
 
@@ -351,67 +522,245 @@ class MiracleCastGUI(QMainWindow):
             self.show_error(f"Universal script not found at: {self.universal_script}")
             return
             
-        missing = []
-        for cmd in required:
-            if not self.command_exists(cmd):
-                missing.append(cmd)
+        missing = [cmd for cmd in required if shutil.which(cmd) is None]
 
         if missing:
             self.show_error(f"Missing components:\n{', '.join(missing)}\nInstall via Setup instructions")
         else:
+            self.start_helper()
             self.refresh_interfaces()
 
-    def command_exists(self, cmd):
-        """Check if command exists in system PATH"""
-        return subprocess.call(['which', cmd],
-                              stdout=subprocess.DEVNULL,
-                              stderr=subprocess.DEVNULL) == 0
+    def start_helper(self):
+        """Start the universal script in daemon mode to answer interface queries"""
+        process = QProcess(self)
+        self.helper = process
+        process.setStandardErrorFile(QProcess.nullDevice())
+        process.readyReadStandardOutput.connect(self.helper_output)
+        process.finished.connect(lambda exit_code, exit_status: self.helper_finished(process))
+        process.errorOccurred.connect(
+            lambda error: self.helper_finished(process) if error == QProcess.FailedToStart else None)
+        process.start(self.universal_script, ['--daemon'])
+
+    def helper_output(self):
+        """Collect helper replies, each one is terminated by a blank line"""
+        while self.helper.canReadLine():
+            line = self.helper.readLine().data().decode('utf-8', errors='replace').strip()
+            if line:
+                self.helper_lines.append(line)
+                continue
+            lines, self.helper_lines = self.helper_lines, []
+            if self.helper_requests:
+                self.helper_requests.pop(0)(lines)
+
+    def helper_finished(self, process):
+        """Fall back to one-shot queries once the helper is gone"""
+        if self.helper is not process:
+            return
+        self.helper = None
+        self.helper_lines = []
+        process.deleteLater()
+        if self.helper_requests:
+            # Requests still waiting for a reply are answered the slow way
+            self.helper_requests = []
+            self.refresh_interfaces()
+
+    def run_task(self, task, cmd, callback, merged=False):
+        """Run a short-lived command asynchronously and hand its output to callback"""
+        if task in self.tasks:
+            # Already in flight, share its result instead of running it twice
+            self.tasks[task][1].append(callback)
+            return
+
+        # Keep a reference so the process isn't garbage collected while running
+        process = QProcess(self)
+        self.tasks[task] = (process, [callback])
+        if merged:
+            process.setProcessChannelMode(QProcess.MergedChannels)
+
+        process.finished.connect(
+            lambda exit_code, exit_status: self.task_finished(
+                task, process, exit_code if exit_status == QProcess.NormalExit else -1))
+        process.errorOccurred.connect(
+            lambda error: self.task_finished(task, process, -1)
+            if error == QProcess.FailedToStart else None)
+        process.start(cmd[0], cmd[1:])
+
+    def task_finished(self, task, process, exit_code):
+        """Handle task completion"""
+        _, callbacks = self.tasks.pop(task)
+        output = process.readAllStandardOutput().data().decode('utf-8', errors='replace')
+        process.deleteLater()
+        for callback in callbacks:
+            try:
+                callback(exit_code, output)
+            except Exception as e:
+                self.log(f"Task '{task}' failed: {str(e)}", error=True)
 
     def refresh_interfaces(self, combo=None):
         """Refresh available network interfaces"""
-        try:
-            # Use the miracle-utils.sh function via universal script to find wireless interfaces
-            cmd = f"{self.universal_script} --list-interfaces"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                # Fallback to direct method if script fails
-                result = subprocess.run(['ip', 'link', 'show'], capture_output=True, text=True)
-                interfaces = re.findall(r'\d+: ([^:]+):', result.stdout)
-                valid_ifaces = [iface for iface in interfaces
-                              if not iface.startswith(('lo', 'virbr', 'docker'))]
-            else:
-                valid_ifaces = result.stdout.strip().split('\n')
-
-            targets = [self.iface_combo, self.source_iface_combo] if combo is None else [combo]
-            for widget in targets:
-                widget.clear()
-                widget.addItems(valid_ifaces)
-        except Exception as e:
-            self.log(f"Interface refresh failed: {str(e)}", error=True)
+        if (self.interfaces_time is not None
+                and time.monotonic() - self.interfaces_time < _IFACE_CACHE_TTL):
+            # Repeated clicks reuse the list that was just queried
+            self.populate_interfaces(self.interfaces, combo)
+            return
+
+        if self.helper is not None:
+            # Ask the running helper instead of spawning a new script
+            self.helper_requests.append(lambda ifaces: self.interfaces_found(ifaces, combo))
+            self.helper.write(b"list-interfaces\n")
+            return
+
+        # Use the miracle-utils.sh function via universal script to find wireless interfaces
+        self.run_task('interfaces-script', [self.universal_script, '--list-interfaces'],
+                      lambda exit_code, output: self.interfaces_listed(exit_code, output, combo))
+
+    def interfaces_listed(self, exit_code, output, combo):
+        """Handle interface list from the universal script"""
+        if exit_code != 0:
+            # Fallback to direct method if script fails
+            self.run_task('interfaces-links', ['ip', 'link', 'show'],
+                          lambda exit_code, output: self.links_listed(output, combo))
+            return
+
+        self.interfaces_found([line for line in output.splitlines() if line.strip()], combo)
+
+    def links_listed(self, output, combo):
+        """Handle interface list from ip link"""
+        matches = (_IFACE_RE.match(line) for line in output.splitlines())
+        valid_ifaces = [m.group(1) for m in matches
+                        if m and not m.group(1).startswith(_SKIP_PREFIXES)]
+        self.interfaces_found(valid_ifaces, combo)
+
+    def interfaces_found(self, ifaces, combo):
+        """Remember a freshly queried interface list and show it"""
+        self.interfaces = ifaces
+        self.interfaces_time = time.monotonic()
+        self.populate_interfaces(ifaces, combo)
+
+    def populate_interfaces(self, ifaces, combo=None):
+        """Fill interface combos with the given interfaces"""
+        if combo is None:
+            targets = [self.iface_combo]
+            if self.source_tab is not None:
+                targets.append(self.source_iface_combo)
+        else:
+            targets = [combo]
+        for widget in targets:
+            widget.clear()
+            widget.addItems(ifaces)
+
+    def check_services_status(self, service_name=None):
+        """Update service status indicators, for all services unless one is given"""
+        # Query services in parallel, each label is updated as its answer arrives
+        for service, label in (("NetworkManager", self.nm_status),
+                               ("wpa_supplicant", self.wpa_status)):
+            if service_name is not None and service != service_name:
+                continue
+            self.run_task(f"status-{service}", ['systemctl', 'is-active', service],
+                          lambda exit_code, output, label=label:
+                              label.setText("Running" if exit_code == 0 else "Stopped"))
+
+    def watch_services_status(self):
+        """Follow service status through systemd D-Bus signals"""
+        bus = QDBusConnection.systemBus()
+        if not bus.isConnected():
+            self.log("System D-Bus not available, service status won't update automatically")
+            self.check_services_status()
+            return
+
+        # systemd only emits unit property changes while a client is subscribed
+        bus.send(QDBusMessage.createMethodCall(
+            _SYSTEMD_SERVICE, _SYSTEMD_PATH, _SYSTEMD_MANAGER, 'Subscribe'))
+
+        units = (("NetworkManager.service", self.nm_status),
+                 ("wpa_supplicant.service", self.wpa_status))
+        self.units_loading = len(units)
+        for unit, label in units:
+            # LoadUnit also returns the object path of units that aren't active
+            message = QDBusMessage.createMethodCall(
+                _SYSTEMD_SERVICE, _SYSTEMD_PATH, _SYSTEMD_MANAGER, 'LoadUnit')
+            message.setArguments([unit])
+            self.dbus_call(message, lambda reply, unit=unit, label=label:
+                           self.unit_loaded(unit, label, reply))
+
+    def dbus_call(self, message, callback):
+        """Send a system bus method call without blocking and hand its reply to callback"""
+        watcher = QDBusPendingCallWatcher(QDBusConnection.systemBus().asyncCall(message), self)
+        watcher.finished.connect(lambda watcher: self.dbus_replied(watcher, callback))
+
+    def dbus_replied(self, watcher, callback):
+        """Handle a D-Bus method reply"""
+        reply = QDBusPendingReply(watcher).reply()
+        watcher.deleteLater()
+        callback(reply)
+
+    def unit_loaded(self, unit, label, reply):
+        """Start following a unit once systemd returned its object path"""
+        self.units_loading -= 1
+        if reply.type() == QDBusMessage.ErrorMessage:
+            self.log(f"Could not watch {unit}: {reply.errorMessage()}", error=True)
+        else:
+            path = reply.arguments()[0]
+            if isinstance(path, QDBusObjectPath):
+                path = path.path()
+            self.unit_labels[path] = label
+            QDBusConnection.systemBus().connect(
+                _SYSTEMD_SERVICE, path, _DBUS_PROPERTIES, 'PropertiesChanged',
+                self.unit_properties_changed)
+
+            message = QDBusMessage.createMethodCall(
+                _SYSTEMD_SERVICE, path, _DBUS_PROPERTIES, 'Get')
+            message.setArguments([_SYSTEMD_UNIT, 'ActiveState'])
+            self.dbus_call(message, lambda reply, path=path:
+                           self.update_unit_status(path, reply.arguments()[0])
+                           if reply.type() != QDBusMessage.ErrorMessage else None)
+
+        if not self.units_loading and not self.unit_labels:
+            self.check_services_status()
+
+    @pyqtSlot(QDBusMessage)
+    def unit_properties_changed(self, message):
+        """Handle a systemd unit property change"""
+        interface, changed, invalidated = message.arguments()
+        if interface == _SYSTEMD_UNIT and 'ActiveState' in changed:
+            self.update_unit_status(message.path(), changed['ActiveState'])
+
+    def update_unit_status(self, path, state):
+        """Show the ActiveState of a watched unit"""
+        if isinstance(state, QDBusVariant):
+            state = state.variant()
+        label = self.unit_labels.get(path)
+        if label is not None:
+            label.setText("Running" if state == "active" else "Stopped")
 
-    def check_services_status(self):
-        """Update service status indicators"""
-        try:
-            nm_active = subprocess.call(['systemctl', 'is-active', 'NetworkManager']) == 0
-            wpa_active = subprocess.call(['systemctl', 'is-active', 'wpa_supplicant']) == 0
-            self.nm_status.setText("Running" if nm_active else "Stopped")
-            self.wpa_status.setText("Running" if wpa_active else "Stopped")
-        except Exception as e:
-            self.log(f"Service status check failed: {str(e)}", error=True)
-    
     def show_error(self, message):
         """Display error message dialog"""
         QMessageBox.critical(self, "Error", message)
         
     def log(self, message, error=False):
         """Add message to console log"""
-        timestamp = time.strftime("[%H:%M:%S]")
+        # Timestamps only change once per second, so format them once per second
+        now = int(time.time())
+        if now != self.log_second:
+            self.log_second = now
+            self.log_timestamp = time.strftime("[%H:%M:%S]", time.localtime(now))
+
         prefix = "[ERROR] " if error else ""
-        self.console.append(f"{timestamp} {prefix}{message}")
+        self.log_buffer.append(f"{self.log_timestamp} {prefix}{message}")
+        if not self.log_pending:
+            # Coalesce everything logged during this event loop iteration into one append
+            self.log_pending = True
+            QTimer.singleShot(0, self.flush_log)
         if error:
             print(f"ERROR: {message}", file=sys.stderr)
 
+    def flush_log(self):
+        """Append buffered log messages to the console"""
+        self.log_pending = False
+        if self.log_buffer:
+            self.console.appendPlainText("\n".join(self.log_buffer))
+            self.log_buffer.clear()
+
     def build_universal_cmd(self, mode):
         """Build command line for universal script"""
         if mode == "sink":
@@ -440,36 +789,12 @@ class MiracleCastGUI(QMainWindow):
             # Build options for source mode
             cmd = [self.universal_script, "-i", iface, "-m", "source"]
             
-            # Add resolution if set with validation
-            width = self.source_res_width.text().strip()
-            height = self.source_res_height.text().strip()
-            if width and height and width.isdigit() and height.isdigit():
-                width_val, height_val = int(width), int(height)
-                if 320 <= width_val <= 3840 and 240 <= height_val <= 2160:
-                    cmd.extend(["-r", f"{width}x{height}"])
-                else:
-                    self.show_error("Invalid resolution. Width must be 320-3840, height 240-2160.")
-                    return None
-                
-            # Add FPS if set with validation
-            fps = self.source_fps.text().strip()
-            if fps and fps.isdigit():
-                fps_val = int(fps)
-                if 10 <= fps_val <= 60:
-                    cmd.extend(["-f", fps])
-                else:
-                    self.show_error("Invalid FPS. Must be between 10-60.")
-                    return None
-                
-            # Add bitrate if set with validation
-            bitrate = self.source_bitrate.text().strip()
-            if bitrate and bitrate.isdigit():
-                bitrate_val = int(bitrate)
-                if 1000 <= bitrate_val <= 20000:
-                    cmd.extend(["-b", bitrate])
-                else:
-                    self.show_error("Invalid bitrate. Must be between 1000-20000 kbps.")
-                    return None
+            # Numeric fields are range checked by their validators
+            width = int(self.source_res_width.text())
+            height = int(self.source_res_height.text())
+            cmd.extend(["-r", f"{width}x{height}"])
+            cmd.extend(["-f", str(int(self.source_fps.text()))])
+            cmd.extend(["-b", str(int(self.source_bitrate.text()))])
                 
             # Add hardware fix option
             if not self.source_hw_fixes_check.isChecked():
@@ -491,20 +816,12 @@ class MiracleCastGUI(QMainWindow):
         # Build command with options
         cmd = self.build_universal_cmd("sink")
         self.run_command(cmd, 'sink')
-        self.sink_status_label.setText("Running")
         self.log(f"Started sink mode with universal script on {iface}")
             
     def stop_sink_service(self):
         """Stop sink service with proper termination handling"""
-        if 'sink' in self.processes:
-            process = self.processes['sink']
-            process.terminate()
-            # Wait up to 3 seconds for process to terminate
-            if not process.waitForFinished(3000):
-                self.log("Process didn't terminate gracefully, forcing...", error=True)
-                process.kill()
-            self.sink_status_label.setText("Not Running")
-            self.log("Stopped sink service")
+        if self.stop_process('sink'):
+            self.log("Stopping sink service")
             
     def start_source_service(self):
         """Start source mode using universal script"""
@@ -516,21 +833,33 @@ class MiracleCastGUI(QMainWindow):
         # Build command with options
         cmd = self.build_universal_cmd("source")
         self.run_command(cmd, 'source')
-        self.source_status_label.setText("Running")
         self.log(f"Started source mode with universal script on {iface}")
             
     def stop_source_service(self):
         """Stop source service with proper termination handling"""
-        if 'source' in self.processes:
-            process = self.processes['source']
-            process.terminate()
-            # Wait up to 3 seconds for process to terminate
-            if not process.waitForFinished(3000):
-                self.log("Process didn't terminate gracefully, forcing...", error=True)
-                process.kill()
-            self.source_status_label.setText("Not Running")
-            self.log("Stopped source service")
+        if self.stop_process('source'):
+            self.log("Stopping source service")
             
+    def stop_process(self, process_name):
+        """Terminate a process, the finished handler reports when it's gone"""
+        self.pending_commands.pop(process_name, None)
+        process = self.processes.get(process_name)
+        if process is None or process.state() == QProcess.NotRunning:
+            return False
+
+        self.stopping_processes.add(process_name)
+        self.process_status[process_name].stopping.emit()
+        process.terminate()
+        # Escalate if the process ignores terminate
+        QTimer.singleShot(3000, lambda: self.force_kill(process, process_name))
+        return True
+
+    def force_kill(self, process, process_name):
+        """Kill a process that is still running after terminate"""
+        if process.state() != QProcess.NotRunning:
+            self.log(f"Process '{process_name}' didn't terminate gracefully, forcing kill", error=True)
+            process.kill()
+
     def run_command(self, cmd, process_name):
         """Run a command using QProcess with improved error handling"""
         # Check if command is valid
@@ -538,16 +867,14 @@ class MiracleCastGUI(QMainWindow):
             self.log("Invalid command parameters, cannot execute", error=True)
             return
             
-        if process_name in self.processes:
-            # Stop existing process with timeout handling
-            process = self.processes[process_name]
-            process.terminate()
-            if not process.waitForFinished(3000):  # 3 second timeout
-                self.log(f"Process didn't terminate gracefully, forcing kill", error=True)
-                process.kill()
+        if self.stop_process(process_name):
+            # Start again once the running instance has cleaned up
+            self.pending_commands[process_name] = cmd
+            return
             
-        # Log the command to be executed
-        self.log(f"Running: {' '.join(cmd)}")
+        # Log the command to be executed, quoted so it can be copied into a shell
+        if self.console.isVisible():
+            self.log(f"Running: {shlex.join(cmd)}")
             
         # Create new process
         process = QProcess(self)
@@ -558,116 +885,133 @@ class MiracleCastGUI(QMainWindow):
             lambda: self.process_output(process, process_name, False))
         process.readyReadStandardError.connect(
             lambda: self.process_output(process, process_name, True))
+        process.started.connect(self.process_status[process_name].started)
         process.finished.connect(
             lambda exit_code, exit_status: self.process_finished(process_name, exit_code, exit_status))
         
-        # Start process with error handling
+        process.errorOccurred.connect(
+            lambda error: self.process_error(process, process_name, error))
+        
+        # Start process, a failure to start is reported through errorOccurred
         try:
             process.start(cmd[0], cmd[1:])
-            if not process.waitForStarted(5000):  # 5 second timeout
-                self.log(f"Failed to start process: {cmd[0]}", error=True)
-                self.processes.pop(process_name, None)
-                if process_name == 'sink':
-                    self.sink_status_label.setText("Start Failed")
-                elif process_name == 'source':
-                    self.source_status_label.setText("Start Failed")
         except Exception as e:
             self.log(f"Exception starting process: {str(e)}", error=True)
             self.processes.pop(process_name, None)
             
+    def process_error(self, process, process_name, error):
+        """Handle a process that could not be started"""
+        if error != QProcess.FailedToStart:
+            return
+        self.log(f"Failed to start process: {process.program()}", error=True)
+        if self.processes.get(process_name) is process:
+            self.processes.pop(process_name)
+        self.process_status[process_name].failedToStart.emit()
+            
     def process_finished(self, process_name, exit_code, exit_status):
         """Handle process completion"""
-        if exit_code != 0:
+        # Log output that didn't end with a newline
+        for is_error in (False, True):
+            partial = self.output_partial.pop((process_name, is_error), b"")
+            if partial:
+                self.log_output(process_name, [partial], is_error)
+
+        if process_name in self.stopping_processes:
+            # Exit codes of a requested stop are not errors
+            self.stopping_processes.discard(process_name)
+            self.log(f"Process '{process_name}' stopped")
+            self.process_status[process_name].stopped.emit()
+        elif exit_code != 0:
             self.log(f"Process '{process_name}' exited with code {exit_code}", error=True)
-            if process_name == 'sink':
-                self.sink_status_label.setText("Error")
-            elif process_name == 'source':
-                self.source_status_label.setText("Error")
+            self.process_status[process_name].errored.emit()
         else:
             self.log(f"Process '{process_name}' completed successfully")
-            if process_name == 'sink':
-                self.sink_status_label.setText("Not Running")
-            elif process_name == 'source':
-                self.source_status_label.setText("Not Running")
+            self.process_status[process_name].stopped.emit()
+
+        cmd = self.pending_commands.pop(process_name, None)
+        if cmd is not None:
+            self.run_command(cmd, process_name)
+
+        if self.closing and not self.processes_running():
+            # Everything cleaned up, possibly before the grace period ran out
+            self.close()
         
     def process_output(self, process, name, is_error):
         """Handle process output"""
         if is_error:
-            output = process.readAllStandardError().data().decode('utf-8', errors='replace')
-            self.log(f"[{name}] {output}", error=True)
+            data = process.readAllStandardError()
         else:
-            output = process.readAllStandardOutput().data().decode('utf-8', errors='replace')
-            self.log(f"[{name}] {output}")
+            data = process.readAllStandardOutput()
+
+        # Reads don't follow line boundaries, keep the unterminated tail for the next one
+        key = (name, is_error)
+        lines = (self.output_partial.pop(key, b"") + data.data()).split(b"\n")
+        if lines[-1]:
+            self.output_partial[key] = lines[-1]
+        self.log_output(name, lines[:-1], is_error)
+
+    def log_output(self, name, lines, is_error):
+        """Log complete process output lines, summarizing floods"""
+        now = int(time.monotonic())
+        if now != self.log_rate_second:
+            self.log_rate_second = now
+            self.log_rate = 0
+        self.log_rate += len(lines)
+
+        # Past the flood rate only count lines, they are summarized once per second
+        overflow = min(self.log_rate - _LOG_FLOOD_RATE, len(lines))
+        if overflow > 0:
+            if not self.log_suppressed:
+                QTimer.singleShot(1000, self.report_suppressed)
+            self.log_suppressed += overflow
+            lines = lines[:len(lines) - overflow]
+
+        for line in lines:
+            # Only whole lines are decoded, so multi-byte characters stay intact
+            text = line.decode('utf-8', errors='replace').rstrip('\r')
+            self.log(f"[{name}] {text}", error=is_error)
+
+    def report_suppressed(self):
+        """Log how many process output lines were dropped during a flood"""
+        if self.log_suppressed:
+            self.log(f"[{self.log_suppressed} lines suppressed]")
+            self.log_suppressed = 0
             
     def manage_service(self, service_name, start=True):
         """Manage system services with improved validation"""
-        # Validate service name to prevent command injection
-        if not re.match(r'^[a-zA-Z0-9_.-]+$', service_name):$', service_name):
-            error_msg = f"Invalid service name format: {service_name}"
+        # Only whitelisted services may be managed, which also rules out command injection
+        if service_name not in _ALLOWED_SERVICES:
+            error_msg = f"Service management not allowed for: {service_name}"
             self.show_error(error_msg)
             self.log(error_msg, error=True)
             return
             
         action = "start" if start else "stop"
-        try:
-            # Use a whitelist approach for allowed services
-            allowed_services = ["NetworkManager", "wpa_supplicant", "network-manager"]
-            if service_name not in allowed_services:
-                error_msg = f"Service management not allowed for: {service_name}"
-                self.show_error(error_msg)
-                self.log(error_msg, error=True)
-                return
-                
-            result = subprocess.run(['sudo', 'systemctl', action, service_name], 
-                                   capture_output=True, text=True)
-            if result.returncode == 0:
-                self.log(f"{service_name} {action}ed successfully")
-                self.check_services_status()
-            else:
-                error_msg = result.stderr.strip() or f"Failed to {action} {service_name}"
-                self.show_error(error_msg)
-                self.log(error_msg, error=True)
-        except Exception as e:
-            self.show_error(f"Error: {str(e)}")
-            self.log(str(e), error=True)
+        task = f"service-{service_name}"
+        if task in self.tasks:
+            error_msg = f"A start or stop of {service_name} is still running, try again when it finishes"
+            self.show_error(error_msg)
+            self.log(error_msg, error=True)
+            return
 
+        # stderr is merged so systemctl's error message reaches the callback
+        self.run_task(task, ['sudo', 'systemctl', action, service_name],
+                      lambda exit_code, output: self.service_managed(
+                          service_name, action, exit_code, output),
+                      merged=True)
 
-# Add a helper function to the universal script
-def add_list_interfaces_option():
-    """Add --list-interfaces option to universal script to list wireless interfaces only"""
-    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "miraclecast-universal.sh")
-    
-    # Check if the option already exists
-    with open(script_path, 'r') as f:
-        content = f.read()
-        if '--list-interfaces' in content:
-            return  # Option already exists
-    
-    # Add the option handling to the getopts section
-    updated_content = content.replace(
-        "while getopts \"i:m:r:f:b:ugnsh\" opt; do",
-        "while getopts \"i:m:r:f:b:ugnslh\" opt; do",
-    )
-    
-    # Add case for the new option
-    updated_content = updated_content.replace(
-        "        h)\n            show_help\n            exit 0\n            ;;",
-        "        h)\n            show_help\n            exit 0\n            ;;\n" +
-        "        l)\n            # List wireless interfaces only\n" +
-        "            find_wireless_network_interfaces\n" +
-        "            exit 0\n            ;;"
-    )
-    
-    # Update help text
-    updated_content = updated_content.replace(
-        "  -h               Show this help message",
-        "  -h               Show this help message\n" +
-        "  -l               List available wireless interfaces"
-    )
-    
-    # Write updated script
-    with open(script_path, 'w') as f:
-        f.write(updated_content)
+    def service_managed(self, service_name, action, exit_code, output):
+        """Handle the result of a service start or stop"""
+        if exit_code == 0:
+            self.log(f"{service_name} {action}ed successfully")
+            labels = {"NetworkManager": self.nm_status, "wpa_supplicant": self.wpa_status}
+            if labels.get(service_name) not in self.unit_labels.values():
+                # Only watched units update their labels from D-Bus signals
+                self.check_services_status(service_name)
+        else:
+            error_msg = output.strip() or f"Failed to {action} {service_name}"
+            self.show_error(error_msg)
+            self.log(error_msg, error=True)
 
 
 # Main entry point
@@ -678,19 +1022,10 @@ if __name__ == "__main__":
         print("Please run with sudo or pkexec.")
         sys.exit(1)
     
-    # Add list interfaces option to universal script if needed
-    try:
-        add_list_interfaces_option()
-    except Exception as e:
-        print(f"Warning: Could not update universal script: {e}")
-        
     # Ensure helper scripts are executable
     try:
-        script_path = os.path.dirname(os.path.abspath(__file__))
-        universal_script = os.path.join(script_path, "miraclecast-universal.sh")
-        subprocess.run(['chmod', '+x', universal_script], check=True)
-        
         helper_scripts = [
+            "miraclecast-universal.sh",
             "res/hardware-compatibility-fixer.sh",
             "res/network-session-manager.sh",
             "res/miracle-gst-improved",
@@ -699,9 +1034,10 @@ if __name__ == "__main__":
         ]
         
         for script in helper_scripts:
-            script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script)
-            if os.path.exists(script_path):
-                subprocess.run(['chmod', '+x', script_path], check=True)
+            path = os.path.join(_MODULE_DIR, script)
+            if os.path.exists(path):
+                mode = os.stat(path).st_mode
+                os.chmod(path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
     except Exception as e:
         print(f"Warning: Could not set executable permissions: {e}")
         
@@ -52,6 +52,8 @@ show_help() {
     echo "  -n               No hardware fixes (skip hardware compatibility checks)"
     echo "  -s               No session management (completely stop network services)"
     echo "  -h               Show this help message"
+    echo "  --list-interfaces  List available wireless interfaces and exit"
+    echo "  --daemon           Answer GUI requests read from stdin, one per line"
     echo
     echo "Examples:"
     echo "  $0 -i wlan0                     # Run in sink mode on wlan0"
@@ -62,6 +64,26 @@ show_help() {
     echo
 }
 
+# Long options used by the GUI, handled before getopts
+case "$1" in
+    --list-interfaces)
+        find_wireless_network_interfaces
+        exit 0
+        ;;
+    --daemon)
+        # Each reply is terminated by a blank line
+        while read -r cmd; do
+            case "$cmd" in
+                list-interfaces)
+                    find_wireless_network_interfaces
+                    ;;
+            esac
+            echo
+        done
+        exit 0
+        ;;
+esac
+
 # Parse command-line arguments
 while getopts "i:m:r:f:b:ugnsh" opt; do
     case $opt in